@@ -0,0 +1,425 @@
+"""Bulk export of LeetCode stats for offline analysis.
+
+Usage:
+    python -m app.export usernames.txt --output out/stats --format csv
+    cat usernames.txt | python -m app.export - --output out/stats
+
+Each row type (stat_cards, problems, skills, contest, errors) is written to its
+own file next to the output prefix, e.g. ``out/stats.contest.csv``. Parquet
+output (requires pyarrow) is written as a directory of part files per row type.
+
+Progress is recorded in ``<output>.checkpoint`` after every flushed batch, so a
+crashed run can be restarted with the same arguments: finished users are
+skipped and any rows written after the last checkpoint are discarded.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from app.services.helpers.profile import (
+    get_accepted_problems_count_from_data,
+    get_contest_ranking_from_data,
+    get_skills_stats_from_data,
+    get_stat_cards_from_data,
+)
+from app.services.leetcode import LeetCodeDataService
+
+ROW_FIELDS = {
+    "stat_cards": [
+        "username",
+        "total_solved",
+        "acceptance_rate",
+        "contest_rating",
+        "global_ranking",
+        "top_percentage",
+        "contests_attended",
+    ],
+    "problems": ["username", "difficulty", "accepted", "total"],
+    "skills": ["username", "category", "tag", "problems_solved"],
+    "contest": ["username", "contest", "ranking", "rating", "rating_delta"],
+    "errors": ["username", "error"],
+}
+
+# Column types, so every batch (and every Parquet part) agrees on the schema
+FIELD_TYPES = {
+    "username": str,
+    "total_solved": int,
+    "acceptance_rate": float,
+    "contest_rating": int,
+    "global_ranking": int,
+    "top_percentage": float,
+    "contests_attended": int,
+    "difficulty": str,
+    "accepted": int,
+    "total": int,
+    "category": str,
+    "tag": str,
+    "problems_solved": int,
+    "contest": str,
+    "ranking": int,
+    "rating": int,
+    "rating_delta": int,
+    "error": str,
+}
+
+# Only the operations the not-found check and flatten_user_rows read
+EXPORT_OPERATIONS = [
+    "userPublicProfile",
+    "getUserProfile",
+    "skillStats",
+    "userContestRankingInfo",
+]
+
+
+def flatten_user_rows(username: str, user_data) -> Dict[str, List[dict]]:
+    """Flatten one user's fetched data into rows keyed by row type"""
+    rows: Dict[str, List[dict]] = {kind: [] for kind in ROW_FIELDS}
+
+    stat_cards = get_stat_cards_from_data(user_data)
+    # "N/A" placeholders become nulls so columns keep a single type
+    rows["stat_cards"].append(
+        {
+            field: None if stat_cards.get(field) == "N/A" else stat_cards.get(field)
+            for field in ROW_FIELDS["stat_cards"][1:]
+        }
+    )
+
+    problems = get_accepted_problems_count_from_data(user_data)
+    if problems:
+        for difficulty, accepted, total in zip(
+            problems["labels"], problems["series"], problems["totals"]
+        ):
+            rows["problems"].append(
+                {"difficulty": difficulty, "accepted": accepted, "total": total}
+            )
+
+    for skill in get_skills_stats_from_data(user_data) or []:
+        for tag, solved in zip(skill["categories"], skill["series"]):
+            rows["skills"].append(
+                {"category": skill["title"], "tag": tag, "problems_solved": solved}
+            )
+
+    chart = get_contest_ranking_from_data(user_data).get("chart")
+    if chart:
+        for contest, ranking, rating, delta in zip(
+            chart["categories"],
+            chart["rankings"],
+            chart["ratings"],
+            chart["rating_deltas"],
+        ):
+            rows["contest"].append(
+                {
+                    "contest": contest,
+                    "ranking": ranking,
+                    "rating": rating,
+                    "rating_delta": delta,
+                }
+            )
+
+    for kind_rows in rows.values():
+        for row in kind_rows:
+            row["username"] = username
+            for field, value in row.items():
+                if value is not None:
+                    row[field] = FIELD_TYPES[field](value)
+    return rows
+
+
+def read_usernames(source: str) -> Iterator[str]:
+    """Yield usernames one per line from a file path or "-" for stdin"""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            username = line.strip()
+            if username and not username.startswith("#"):
+                yield username
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class Checkpoint:
+    """Append-only log of flushed batches.
+
+    Each line records the usernames completed by a batch and the size of every
+    output file after it was flushed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        self.offsets: Dict[str, int] = {}
+        self.batch = 0
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # partially written last line
+                    self.done.update(entry["usernames"])
+                    self.offsets = entry["offsets"]
+                    self.batch = entry["batch"] + 1
+
+    def record(self, usernames: List[str], offsets: Dict[str, int]) -> None:
+        entry = {"batch": self.batch, "usernames": usernames, "offsets": offsets}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.offsets = offsets
+        self.batch += 1
+
+
+class _FileWriter:
+    """Append rows to one text file per row type (NDJSON or CSV)"""
+
+    def __init__(self, prefix: str, fmt: str, checkpoint: Checkpoint):
+        self.fmt = fmt
+        self.files = {}
+        for kind, fields in ROW_FIELDS.items():
+            path = f"{prefix}.{kind}.{fmt}"
+            f = open(path, "a+", encoding="utf-8", newline="")
+            # Drop rows written after the last checkpoint
+            f.truncate(checkpoint.offsets.get(kind, 0))
+            f.seek(0, os.SEEK_END)
+            if fmt == "csv" and f.tell() == 0:
+                csv.writer(f).writerow(fields)
+            self.files[kind] = f
+
+    def write_batch(self, rows: Dict[str, List[dict]], batch: int) -> Dict[str, int]:
+        for kind, kind_rows in rows.items():
+            f = self.files[kind]
+            if self.fmt == "csv":
+                writer = csv.DictWriter(f, fieldnames=ROW_FIELDS[kind])
+                writer.writerows(kind_rows)
+            else:
+                for row in kind_rows:
+                    f.write(json.dumps(row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return {kind: f.tell() for kind, f in self.files.items()}
+
+    def close(self) -> None:
+        for f in self.files.values():
+            f.close()
+
+
+class _ParquetWriter:
+    """Write each batch as a part file in one directory per row type"""
+
+    def __init__(self, prefix: str, checkpoint: Checkpoint):
+        import pyarrow as pa  # fail early if pyarrow is missing
+
+        arrow_types = {str: pa.string(), int: pa.int64(), float: pa.float64()}
+        self.schemas = {
+            kind: pa.schema([(field, arrow_types[FIELD_TYPES[field]]) for field in fields])
+            for kind, fields in ROW_FIELDS.items()
+        }
+        self.dirs = {}
+        for kind in ROW_FIELDS:
+            directory = f"{prefix}.{kind}.parquet"
+            os.makedirs(directory, exist_ok=True)
+            # Parts from batches that never reached the checkpoint
+            for name in os.listdir(directory):
+                if name.startswith("part-") and int(name[5:10]) >= checkpoint.batch:
+                    os.remove(os.path.join(directory, name))
+            self.dirs[kind] = directory
+
+    def write_batch(self, rows: Dict[str, List[dict]], batch: int) -> Dict[str, int]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for kind, kind_rows in rows.items():
+            if not kind_rows:
+                continue
+            table = pa.Table.from_pylist(kind_rows, schema=self.schemas[kind])
+            path = os.path.join(self.dirs[kind], f"part-{batch:05d}.parquet")
+            pq.write_table(table, path + ".tmp")
+            os.replace(path + ".tmp", path)
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+class RateLimiter:
+    """Allow at most `rate` acquisitions per second across all workers"""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def export_users(
+    usernames: Iterable[str],
+    output: str,
+    fmt: str = "ndjson",
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    batch_size: int = 200,
+    checkpoint_path: Optional[str] = None,
+) -> Dict[str, int]:
+    """Fetch and export every username, resuming from the checkpoint if present"""
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+
+    checkpoint = Checkpoint(checkpoint_path or f"{output}.checkpoint")
+    if fmt == "parquet":
+        writer = _ParquetWriter(output, checkpoint)
+    else:
+        writer = _FileWriter(output, fmt, checkpoint)
+
+    limiter = RateLimiter(rate)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue = asyncio.Queue(maxsize=batch_size)
+    stats = {"exported": 0, "not_found": 0, "invalid": 0, "failed": 0, "skipped": 0}
+
+    async def produce():
+        for username in usernames:
+            if username in checkpoint.done:
+                stats["skipped"] += 1
+                continue
+            await pending.put(username)
+        for _ in range(concurrency):
+            await pending.put(None)
+
+    async def work():
+        while True:
+            username = await pending.get()
+            if username is None:
+                await results.put(None)
+                return
+            await limiter.acquire()
+            user_map = await LeetCodeDataService.fetch_all_user_data(
+                [username], operations=EXPORT_OPERATIONS
+            )
+            await results.put((username, user_map.get(username) or {}))
+
+    async def write():
+        batch_users: List[str] = []
+        batch_rows: Dict[str, List[dict]] = {kind: [] for kind in ROW_FIELDS}
+        finished_workers = 0
+
+        def flush():
+            offsets = writer.write_batch(batch_rows, checkpoint.batch)
+            checkpoint.record(batch_users, offsets)
+            checkpoint.done.update(batch_users)
+            print(
+                f"Batch {checkpoint.batch - 1}: {len(batch_users)} users "
+                f"({stats['exported']} exported so far)",
+                file=sys.stderr,
+            )
+            batch_users.clear()
+            for kind_rows in batch_rows.values():
+                kind_rows.clear()
+
+        while finished_workers < concurrency:
+            item = await results.get()
+            if item is None:
+                finished_workers += 1
+                continue
+
+            username, user_data = item
+            if not user_data or any(v is None for v in user_data.values()):
+                # Transient fetch failure: leave it for the next run
+                stats["failed"] += 1
+                print(f"Failed to fetch {username}, will retry on resume", file=sys.stderr)
+                continue
+
+            profile = user_data.get("userPublicProfile") or {}
+            if profile.get("matchedUser") is None:
+                stats["not_found"] += 1
+                batch_rows["errors"].append(
+                    {"username": username, "error": "User not found"}
+                )
+            else:
+                try:
+                    user_rows = flatten_user_rows(username, user_data)
+                except Exception as e:
+                    # Record the failure instead of crashing this and every resumed run
+                    stats["invalid"] += 1
+                    print(f"Failed to flatten {username}: {e}", file=sys.stderr)
+                    batch_rows["errors"].append(
+                        {"username": username, "error": f"Invalid data: {e}"}
+                    )
+                else:
+                    stats["exported"] += 1
+                    for kind, kind_rows in user_rows.items():
+                        batch_rows[kind].extend(kind_rows)
+            batch_users.append(username)
+
+            if len(batch_users) >= batch_size:
+                flush()
+
+        if batch_users:
+            flush()
+
+    try:
+        await asyncio.gather(
+            produce(), write(), *[work() for _ in range(concurrency)]
+        )
+    finally:
+        writer.close()
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.export",
+        description="Export LeetCode stats for many usernames",
+    )
+    parser.add_argument("input", help="File with one username per line, or - for stdin")
+    parser.add_argument("--output", "-o", required=True, help="Output path prefix")
+    parser.add_argument(
+        "--format", "-f", choices=["ndjson", "csv", "parquet"], default="ndjson"
+    )
+    parser.add_argument("--concurrency", "-c", type=int, default=8)
+    parser.add_argument(
+        "--rate", type=float, default=None, help="Maximum users fetched per second"
+    )
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file path")
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--format parquet requires pyarrow to be installed")
+
+    stats = asyncio.run(
+        export_users(
+            read_usernames(args.input),
+            args.output,
+            fmt=args.format,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            batch_size=args.batch_size,
+            checkpoint_path=args.checkpoint,
+        )
+    )
+    print(json.dumps(stats), file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""Load-test harness for the profile and compare pages.
+
+Usage:
+    python -m app.loadtest --rates 10,25,50 --duration 20 --upstream-latency 0.15
+
+Starts a stand-in LeetCode GraphQL upstream and the app in separate processes
+(so the load generator does not share the app's event loop or GIL), then
+drives an open-loop mix of /profile and /compare requests at each target rate.
+For every stage it reports throughput, latency percentiles and errors, plus the
+app process's event-loop lag and resident memory.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+DIFFICULTIES = ["All", "Easy", "Medium", "Hard"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process (0 if unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of `values`"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+# --- Stand-in upstream ---
+
+
+def fake_graphql_data(operation: str, username: str, contests: int) -> Optional[Dict]:
+    """Deterministic synthetic response data for one GraphQL operation"""
+    if username.startswith("missing"):
+        return {"matchedUser": None}
+
+    rng = random.Random(f"{username}:{operation}")
+    profile = {
+        "ranking": rng.randint(1, 500000),
+        "userAvatar": "https://assets.leetcode.com/users/default_avatar.jpg",
+        "realName": username.title(),
+        "aboutMe": "",
+        "countryName": "",
+        "company": "",
+        "jobTitle": "",
+        "reputation": rng.randint(0, 100),
+    }
+
+    if operation in ("userPublicProfile", "userProfile"):
+        return {"matchedUser": {"username": username, "profile": profile}}
+
+    if operation == "getUserProfile":
+        counts = [rng.randint(0, 800) for _ in DIFFICULTIES]
+        return {
+            "allQuestionsCount": [{"difficulty": d, "count": 3000} for d in DIFFICULTIES],
+            "matchedUser": {
+                "contributions": {"points": 0, "questionCount": 0, "testcaseCount": 0},
+                "profile": {"reputation": 0, "ranking": profile["ranking"]},
+                "submitStats": {
+                    "acSubmissionNum": [
+                        {"difficulty": d, "count": c, "submissions": c * 2 + 1}
+                        for d, c in zip(DIFFICULTIES, counts)
+                    ]
+                },
+                "submissionCalendar": "{}",
+                "languageProblemCount": [
+                    {"languageName": lang, "problemsSolved": rng.randint(1, 400)}
+                    for lang in ("Python3", "C++", "Java")
+                ],
+            },
+        }
+
+    if operation == "skillStats":
+        return {
+            "matchedUser": {
+                "tagProblemCounts": {
+                    level: [
+                        {"tagName": f"{level}-{i}", "problemsSolved": rng.randint(0, 120)}
+                        for i in range(12)
+                    ]
+                    for level in ("advanced", "intermediate", "fundamental")
+                }
+            }
+        }
+
+    if operation == "userContestRankingInfo":
+        rating = 1500.0
+        history = []
+        for i in range(contests):
+            rating += rng.uniform(-60, 70)
+            history.append(
+                {
+                    "attended": rng.random() > 0.1,
+                    "problemsSolved": rng.randint(0, 4),
+                    "ranking": rng.randint(1, 30000),
+                    "rating": rating,
+                    "contest": {"title": f"Weekly Contest {i + 1}", "startTime": i},
+                }
+            )
+        return {
+            "userContestRanking": {
+                "attendedContestsCount": contests,
+                "rating": rating,
+                "globalRanking": rng.randint(1, 500000),
+                "totalParticipants": 600000,
+                "topPercentage": rng.uniform(0, 100),
+                "badge": None,
+            },
+            "userContestRankingHistory": history,
+        }
+
+    if operation == "userBadges":
+        return {"matchedUser": {"badges": []}}
+
+    return None
+
+
+def _serve_upstream(port: int, latency: float, jitter: float, error_rate: float, contests: int):
+    import uvicorn
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    upstream = FastAPI()
+
+    @upstream.post("/graphql")
+    async def graphql(request: Request):
+        payload = await request.json()
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)))
+        if random.random() < error_rate:
+            return JSONResponse({"errors": [{"message": "injected"}]}, status_code=500)
+        data = fake_graphql_data(
+            payload["operationName"], payload["variables"]["username"], contests
+        )
+        return {"data": data}
+
+    uvicorn.run(upstream, host="127.0.0.1", port=port, log_level="warning")
+
+
+# --- App under test ---
+
+
+def _serve_app(port: int, upstream_url: str, conn, lag_interval: float):
+    os.environ["LEETCODE_GRAPHQL_URL"] = upstream_url
+    import uvicorn
+
+    from app.main import app
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    lags: List[float] = []
+    peak_rss = [0]
+
+    async def monitor():
+        loop = asyncio.get_running_loop()
+        while not server.should_exit:
+            expected = loop.time() + lag_interval
+            await asyncio.sleep(lag_interval)
+            lags.append(max(0.0, loop.time() - expected))
+            peak_rss[0] = max(peak_rss[0], _rss_bytes())
+            # Stats are pulled by the generator between stages
+            while conn.poll():
+                conn.recv()
+                conn.send({"lags": lags[:], "rss": _rss_bytes(), "peak_rss": peak_rss[0]})
+                lags.clear()
+                peak_rss[0] = 0
+
+    async def main():
+        await asyncio.gather(server.serve(), monitor())
+
+    asyncio.run(main())
+
+
+# --- Load generator ---
+
+
+class Traffic:
+    """Pick request paths from a hot/cold user mix"""
+
+    def __init__(self, hot_users: int, hot_ratio: float, compare_ratio: float, seed: int):
+        self.rng = random.Random(seed)
+        self.hot = [f"hotuser{i}" for i in range(hot_users)]
+        self.hot_ratio = hot_ratio
+        self.compare_ratio = compare_ratio
+        self._cold = 0
+
+    def _user(self) -> str:
+        if self.hot and self.rng.random() < self.hot_ratio:
+            return self.rng.choice(self.hot)
+        self._cold += 1
+        return f"colduser{self._cold}-{self.rng.randrange(10**9)}"
+
+    def next(self):
+        if self.rng.random() < self.compare_ratio:
+            return "compare", f"/compare/{self._user()}/{self._user()}"
+        return "profile", f"/profile/{self._user()}"
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    traffic: Traffic,
+    rate: float,
+    duration: float,
+    max_in_flight: int,
+) -> Dict:
+    """Issue requests at `rate` per second for `duration` seconds (open loop)"""
+    results: List[tuple] = []
+    dropped = 0
+    in_flight = set()
+
+    async def one(kind: str, path: str):
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            ok = response.status_code == 200 and "alert-error" not in response.text
+        except httpx.HTTPError:
+            ok = False
+        results.append((kind, time.perf_counter() - started, ok))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    sent = 0
+    while True:
+        now = loop.time()
+        if now - start >= duration:
+            break
+        due = int((now - start) * rate) + 1
+        while sent < due:
+            sent += 1
+            if len(in_flight) >= max_in_flight:
+                dropped += 1
+                continue
+            task = asyncio.ensure_future(one(*traffic.next()))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        await asyncio.sleep(min(0.005, 1.0 / rate))
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    elapsed = loop.time() - start
+
+    report = {
+        "target_rps": rate,
+        "sent": sent,
+        "dropped": dropped,
+        "completed": len(results),
+        "throughput_rps": round(len(results) / elapsed, 2),
+    }
+    for kind in ("all", "profile", "compare"):
+        rows = [r for r in results if kind == "all" or r[0] == kind]
+        latencies = [r[1] * 1000 for r in rows]
+        report[kind] = {
+            "count": len(rows),
+            "errors": sum(1 for r in rows if not r[2]),
+            "p50_ms": _round(percentile(latencies, 50)),
+            "p95_ms": _round(percentile(latencies, 95)),
+            "p99_ms": _round(percentile(latencies, 99)),
+            "max_ms": _round(max(latencies) if latencies else None),
+        }
+    return report
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+async def _wait_ready(url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not start")
+                await asyncio.sleep(0.1)
+
+
+async def run_load_test(args) -> List[Dict]:
+    ctx = multiprocessing.get_context("spawn")
+    upstream_port, app_port = _free_port(), _free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}/graphql"
+
+    upstream = ctx.Process(
+        target=_serve_upstream,
+        args=(upstream_port, args.upstream_latency, args.upstream_jitter,
+              args.error_rate, args.contests),
+        daemon=True,
+    )
+    parent_conn, child_conn = ctx.Pipe()
+    app_proc = ctx.Process(
+        target=_serve_app,
+        args=(app_port, upstream_url, child_conn, args.lag_interval),
+        daemon=True,
+    )
+    upstream.start()
+    app_proc.start()
+
+    reports = []
+    try:
+        await _wait_ready(f"http://127.0.0.1:{upstream_port}/docs")
+        await _wait_ready(f"http://127.0.0.1:{app_port}/robots.txt")
+
+        traffic = Traffic(args.hot_users, args.hot_ratio, args.compare_ratio, args.seed)
+        limits = httpx.Limits(max_connections=args.max_in_flight)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{app_port}", timeout=args.timeout, limits=limits
+        ) as client:
+            for rate in args.rates:
+                parent_conn.send("reset")
+                await asyncio.get_running_loop().run_in_executor(None, parent_conn.recv)
+                report = await run_stage(
+                    client, traffic, rate, args.duration, args.max_in_flight
+                )
+                parent_conn.send("stats")
+                stats = await asyncio.get_running_loop().run_in_executor(
+                    None, parent_conn.recv
+                )
+                lags = [lag * 1000 for lag in stats["lags"]]
+                report["loop_lag_ms"] = {
+                    "p50": _round(percentile(lags, 50)),
+                    "p99": _round(percentile(lags, 99)),
+                    "max": _round(max(lags) if lags else None),
+                }
+                report["app_rss_mb"] = round(stats["rss"] / 2**20, 1)
+                report["app_peak_rss_mb"] = round(stats["peak_rss"] / 2**20, 1)
+                print(json.dumps(report), flush=True)
+                reports.append(report)
+    finally:
+        app_proc.terminate()
+        upstream.terminate()
+        app_proc.join(5)
+        upstream.join(5)
+    return reports
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.loadtest",
+        description="Measure /profile and /compare capacity against a stand-in upstream",
+    )
+    parser.add_argument(
+        "--rates",
+        type=lambda v: [float(r) for r in v.split(",")],
+        default=[5.0, 10.0, 20.0],
+        help="Comma-separated target request rates, one stage each",
+    )
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per stage")
+    parser.add_argument("--compare-ratio", type=float, default=0.3)
+    parser.add_argument("--hot-users", type=int, default=20)
+    parser.add_argument("--hot-ratio", type=float, default=0.8)
+    parser.add_argument("--contests", type=int, default=150, help="Contests per user")
+    parser.add_argument("--upstream-latency", type=float, default=0.1, help="Mean seconds")
+    parser.add_argument("--upstream-jitter", type=float, default=0.03)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--lag-interval", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the stage reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    reports = asyncio.run(run_load_test(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
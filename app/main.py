@@ -1,16 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 
-from app.routers import compare, profile
+from app.routers import compare, images, profile
+from app.services.offload import monitor_event_loop
+from app.services.profiling import install_profiler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor = asyncio.ensure_future(monitor_event_loop())
+    yield
+    monitor.cancel()
+
 
-app = FastAPI(title="LeetCode Visualiser")
+app = FastAPI(title="LeetCode Visualiser", lifespan=lifespan)
+install_profiler(app)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 app.include_router(profile.router)
 app.include_router(compare.router)
+app.include_router(images.router)
 
 
 @app.get("/robots.txt", response_class=PlainTextResponse)
@@ -1,19 +1,22 @@
 import json
+from html import escape
 
 from fastapi import APIRouter, Form, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
-from app.services.helpers.comparison import (
-    compare_contests_from_data,
-    compare_problem_counts_from_data,
-    compare_skills_from_data,
-)
+from app.services.helpers.comparison import compare_all_from_data
 from app.services.helpers.profile import get_profile_details_from_data, get_stat_cards_from_data
+from app.services.images import proxy_image_url
 from app.services.leetcode import LeetCodeDataService
+from app.services.offload import run_in_pool
+from app.services.profiling import phase
+from app.services.usernames import username_index
+from app.services.visualization import VisualizationService
 
 router = APIRouter(prefix="/compare")
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["proxy_image_url"] = proxy_image_url
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -27,6 +30,17 @@ async def submit_comparison(
     request: Request, username1: str = Form(...), username2: str = Form(...)
 ):
     """Handle comparison form submission"""
+    missing = [u for u in (username1, username2) if username_index.is_missing(u)]
+    if missing:
+        error_html = '<div class="alert-error"><i class="fas fa-exclamation-triangle"></i> '
+        error_html += "<br>".join(
+            f"User '{escape(u)}' does not exist on LeetCode or could not be found."
+            for u in missing
+        )
+        error_html += "</div>"
+        return templates.TemplateResponse(
+            request=request, name="compare.html", context={"error": error_html}
+        )
     return RedirectResponse(url=f"/compare/{username1}/{username2}", status_code=303)
 
 
@@ -34,8 +48,9 @@ async def submit_comparison(
 async def comparison_detail(request: Request, username1: str, username2: str):
     """Display detailed comparison between two specific LeetCode profiles"""
 
-    validation1 = await LeetCodeDataService.validate_user(username1)
-    validation2 = await LeetCodeDataService.validate_user(username2)
+    with phase("upstream"):
+        validation1 = await LeetCodeDataService.validate_user(username1)
+        validation2 = await LeetCodeDataService.validate_user(username2)
 
     if not validation1["valid"] or not validation2["valid"]:
         error_messages = []
@@ -53,46 +68,52 @@ async def comparison_detail(request: Request, username1: str, username2: str):
         )
 
     # Fetch all data for both users
-    user_data = await LeetCodeDataService.fetch_all_user_data([username1, username2])
+    with phase("upstream"):
+        user_data = await LeetCodeDataService.fetch_all_user_data(
+            [username1, username2]
+        )
     user1_data = user_data.get(username1)
     user2_data = user_data.get(username2)
 
-    # Generate user profiles
-    user1_details = get_profile_details_from_data(user1_data)
-    user2_details = get_profile_details_from_data(user2_data)
-    users = [user1_details, user2_details]
+    return await run_in_pool(
+        _render_comparison_page, request, username1, username2, user1_data, user2_data
+    )
 
-    # Get stat cards for both users
-    stat_cards1 = get_stat_cards_from_data(user1_data)
-    stat_cards2 = get_stat_cards_from_data(user2_data)
 
-    # Generate comparison chart data
-    problem_comparison = compare_problem_counts_from_data(
-        user1_data, user2_data, username1, username2
-    )
-    skills_comparison = compare_skills_from_data(
-        user1_data, user2_data, username1, username2
-    )
-    contest_comparison = compare_contests_from_data(
-        user1_data, user2_data, username1, username2
-    )
+def _render_comparison_page(request: Request, username1, username2, user1_data, user2_data):
+    """Transform both users' data and render the comparison page (runs in the render pool)"""
+    with phase("transform"):
+        # Generate user profiles
+        user1_details = get_profile_details_from_data(user1_data)
+        user2_details = get_profile_details_from_data(user2_data)
+        users = [user1_details, user2_details]
 
-    chart_data = {
-        "problems": problem_comparison,
-        "skills": skills_comparison,
-        "contest": contest_comparison,
-    }
+        # Get stat cards for both users
+        stat_cards1 = get_stat_cards_from_data(user1_data)
+        stat_cards2 = get_stat_cards_from_data(user2_data)
+
+        # Generate comparison chart data (shared between both orderings)
+        chart_data = compare_all_from_data(
+            user1_data, user2_data, username1, username2
+        )
+        chart_data["contest"] = VisualizationService.compact_chart_data(
+            chart_data["contest"], ["rankings1", "rankings2", "ratings1", "ratings2"]
+        )
+
+    with phase("json"):
+        chart_data_json = json.dumps(chart_data)
 
     context = {
         "users": users,
         "stat_cards": [stat_cards1, stat_cards2],
-        "chart_data_json": json.dumps(chart_data),
+        "chart_data_json": chart_data_json,
         "username1": username1,
         "username2": username2,
         "og_title": f"Compare {username1} vs {username2}",
         "og_description": f"See who's better: {username1} vs {username2}. Compare their LeetCode problem solving stats, contest ratings, and skills side-by-side.",
         "og_image": None,
     }
-    return templates.TemplateResponse(
-        request=request, name="compare.html", context=context
-    )
+    with phase("template"):
+        return templates.TemplateResponse(
+            request=request, name="compare.html", context=context
+        )
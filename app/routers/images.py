@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from app.services.images import ImageProxyService
+
+router = APIRouter(prefix="/images")
+
+CACHE_CONTROL = f"public, max-age={ImageProxyService.INDEX_TTL}"
+
+
+@router.get("/proxy")
+async def proxy_image(
+    request: Request,
+    url: str,
+    size: Optional[int] = Query(None, ge=16, le=512),
+    static: bool = False,
+):
+    """Serve a LeetCode avatar or badge icon from the local image store"""
+    absolute = ImageProxyService.normalize_url(url)
+    if absolute is None:
+        raise HTTPException(status_code=400, detail="Image host is not allowed")
+
+    result = await ImageProxyService.get_image(absolute, size=size, static=static)
+    if result is None:
+        # Fall back to the origin so the page still shows the image
+        return RedirectResponse(url=absolute, status_code=302)
+
+    path, content_type, etag = result
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": f'"{etag}"'}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=content_type, headers=headers)
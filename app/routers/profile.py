@@ -1,7 +1,8 @@
 import json
+from html import escape
 
-from fastapi import APIRouter, Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Form, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
 from app.services.helpers.profile import (
@@ -13,10 +14,19 @@ from app.services.helpers.profile import (
     get_skills_stats_from_data,
     get_stat_cards_from_data,
 )
+from app.services.images import proxy_image_url
 from app.services.leetcode import LeetCodeDataService
+from app.services.offload import run_in_pool
+from app.services.profiling import phase
+from app.services.usernames import username_index
+from app.services.visualization import VisualizationService
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["proxy_image_url"] = proxy_image_url
+
+# Contest histories longer than this are downsampled on the profile page
+CONTEST_CHART_MAX_POINTS = 50
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -28,6 +38,11 @@ async def index(request: Request):
 @router.post("/", response_class=HTMLResponse)
 async def search_profile(request: Request, username: str = Form(...)):
     """Handle search form submission"""
+    if username_index.is_missing(username):
+        error_message = f'<div class="alert-error"><i class="fas fa-exclamation-triangle"></i> User \'{escape(username)}\' does not exist on LeetCode or could not be found.</div>'
+        return templates.TemplateResponse(
+            request=request, name="index.html", context={"error": error_message}
+        )
     return RedirectResponse(url=f"/profile/{username}", status_code=303)
 
 
@@ -35,14 +50,16 @@ async def search_profile(request: Request, username: str = Form(...)):
 async def profile_detail(request: Request, username: str):
     """Display detailed visualization for a specific user profile"""
 
-    validation = await LeetCodeDataService.validate_user(username)
+    with phase("upstream"):
+        validation = await LeetCodeDataService.validate_user(username)
     if not validation["valid"]:
         error_message = f'<div class="alert-error"><i class="fas fa-exclamation-triangle"></i> {validation["message"]}</div>'
         return templates.TemplateResponse(
             request=request, name="index.html", context={"error": error_message}
         )
 
-    user_data_map = await LeetCodeDataService.fetch_all_user_data([username])
+    with phase("upstream"):
+        user_data_map = await LeetCodeDataService.fetch_all_user_data([username])
     user_data = user_data_map.get(username)
 
     if not user_data:
@@ -51,24 +68,37 @@ async def profile_detail(request: Request, username: str):
             request=request, name="index.html", context={"error": error_message}
         )
 
-    problems_data = get_accepted_problems_count_from_data(user_data)
-    skills_data = get_skills_stats_from_data(user_data)
-    user_details = get_profile_details_from_data(user_data)
-    contest_history = get_contest_ranking_from_data(user_data)
-    language_data = get_language_stats_from_data(user_data)
-    stat_cards = get_stat_cards_from_data(user_data)
-    badges = get_badges_from_data(user_data)
-
-    # Build chart data for client-side rendering
-    chart_data = {
-        "problems": problems_data,
-        "languages": language_data,
-        "contest": contest_history.get("chart") if contest_history else None,
-        "skills": skills_data,
-    }
+    return await run_in_pool(_render_profile_page, request, username, user_data)
+
+
+def _render_profile_page(request: Request, username: str, user_data):
+    """Transform the fetched data and render the profile page (runs in the render pool)"""
+    with phase("transform"):
+        problems_data = get_accepted_problems_count_from_data(user_data)
+        skills_data = get_skills_stats_from_data(user_data)
+        user_details = get_profile_details_from_data(user_data)
+        contest_history = get_contest_ranking_from_data(
+            user_data, max_points=CONTEST_CHART_MAX_POINTS
+        )
+        language_data = get_language_stats_from_data(user_data)
+        stat_cards = get_stat_cards_from_data(user_data)
+        badges = get_badges_from_data(user_data)
+
+        # Build chart data for client-side rendering
+        chart_data = {
+            "problems": problems_data,
+            "languages": language_data,
+            "contest": VisualizationService.compact_chart_data(
+                contest_history.get("chart"), ["rankings", "ratings"]
+            ),
+            "skills": skills_data,
+        }
+
+    with phase("json"):
+        chart_data_json = json.dumps(chart_data)
 
     context = {
-        "chart_data_json": json.dumps(chart_data),
+        "chart_data_json": chart_data_json,
         "stat_cards": stat_cards,
         "contest_history": contest_history,
         "users": [user_details],
@@ -78,6 +108,29 @@ async def profile_detail(request: Request, username: str):
         "og_description": f"Check out {username}'s LeetCode stats: {user_details['realname']} has solved problems and attended contests. View their detailed progress!",
         "og_image": user_details["img"],
     }
-    return templates.TemplateResponse(
-        request=request, name="index.html", context=context
+    with phase("template"):
+        return templates.TemplateResponse(
+            request=request, name="index.html", context=context
+        )
+
+
+@router.get("/profile/{username}/contest")
+async def profile_contest_history(username: str):
+    """Return the full-resolution contest chart data for a user"""
+    user_data_map = await LeetCodeDataService.fetch_all_user_data(
+        [username], operations=["userContestRankingInfo"]
     )
+    contest_history = await run_in_pool(
+        get_contest_ranking_from_data, user_data_map.get(username) or {}
+    )
+    return JSONResponse(content=contest_history.get("chart"))
+
+
+@router.get("/suggest")
+async def suggest_usernames(q: str = "", limit: int = Query(8, ge=1, le=20)):
+    """Return known usernames starting with `q`, and whether `q` is known not to exist"""
+    return {
+        "query": q,
+        "suggestions": username_index.suggest(q, limit),
+        "missing": username_index.is_missing(q) if q else False,
+    }
@@ -0,0 +1,288 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Optional
+
+DEFAULT_TTL = 300
+
+
+def data_version(user_data: Dict[str, Any], operations=None) -> str:
+    """Return a short fingerprint of a user's fetched data.
+
+    Any change in the upstream payload yields a new version, so caches keyed on
+    it invalidate themselves without explicit eviction.
+    """
+    if operations is not None:
+        user_data = {op: user_data.get(op) for op in operations}
+    encoded = json.dumps(user_data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=12).hexdigest()
+
+
+class ComparisonCache:
+    """Bounded LRU cache for order-independent comparison structures"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(username1, version1, username2, version2):
+        """Key on the unordered pair of (username, data version)"""
+        a = (username1.lower(), version1)
+        b = (username2.lower(), version2)
+        return (a, b) if a <= b else (b, a)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheBackend:
+    """Interface for caching LeetCodeDataService results.
+
+    Values must be JSON-serialisable so that shared backends can store them.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Async `get`; backends doing blocking I/O run it off the event loop"""
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Async `set`; backends doing blocking I/O run it off the event loop"""
+        self.set(key, value, ttl)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache with TTLs and an entry cap"""
+
+    def __init__(self, max_entries: int = 2048, default_ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache stored in a local SQLite database in WAL mode.
+
+    Several uvicorn workers (or serverless instances sharing a host) can point
+    at the same file, so a user fetched by one process is a hit in all of them.
+    `aget`/`aset` run the SQLite calls on a small dedicated thread pool, since
+    they can wait on another worker's write lock. A background thread prunes
+    expired rows and enforces the entry cap, oldest first, every
+    `prune_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 20000,
+        default_ttl: float = DEFAULT_TTL,
+        prune_interval: float = 60,
+        io_workers: int = 4,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=io_workers, thread_name_prefix="sqlite-cache"
+        )
+        self._stop = threading.Event()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)"
+            )
+
+        self._pruner = threading.Thread(
+            target=self._prune_loop, name="sqlite-cache-prune", daemon=True
+        )
+        self._pruner.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f"Cache read error: {e}")
+            return None
+        except ValueError as e:
+            # Corrupt or truncated value: treat as a miss and drop the row
+            print(f"Cache decode error for {key}: {e}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, stored_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+        except sqlite3.Error as e:
+            print(f"Cache write error: {e}")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.set, key, value, ttl)
+
+    def _prune_loop(self) -> None:
+        while not self._stop.wait(self.prune_interval):
+            try:
+                self.prune()
+            except sqlite3.Error as e:
+                print(f"Cache prune error: {e}")
+
+    def close(self) -> None:
+        """Stop the pruning thread and the I/O pool"""
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+
+    def prune(self) -> None:
+        """Drop expired rows, then the oldest rows beyond the entry cap"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Cache delete error: {e}")
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache")
+        except sqlite3.Error as e:
+            print(f"Cache clear error: {e}")
+
+
+def get_cache_backend() -> CacheBackend:
+    """Build the cache backend selected by the LEETCODE_CACHE_* environment.
+
+    LEETCODE_CACHE_BACKEND is "memory" (default) or "sqlite";
+    LEETCODE_CACHE_PATH, LEETCODE_CACHE_TTL and LEETCODE_CACHE_MAX_ENTRIES
+    tune it.
+    """
+    backend = os.environ.get("LEETCODE_CACHE_BACKEND", "memory").lower()
+    ttl = float(os.environ.get("LEETCODE_CACHE_TTL", DEFAULT_TTL))
+    max_entries = os.environ.get("LEETCODE_CACHE_MAX_ENTRIES")
+
+    if backend == "sqlite":
+        path = os.environ.get(
+            "LEETCODE_CACHE_PATH",
+            os.path.join(tempfile.gettempdir(), "leetcode-visualiser", "cache.sqlite3"),
+        )
+        kwargs = {"max_entries": int(max_entries)} if max_entries else {}
+        return SQLiteCacheBackend(path, default_ttl=ttl, **kwargs)
+
+    kwargs = {"max_entries": int(max_entries)} if max_entries else {}
+    return MemoryCacheBackend(default_ttl=ttl, **kwargs)
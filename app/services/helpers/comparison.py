@@ -1,7 +1,12 @@
 import pandas as pd
 
+from app.services.cache import ComparisonCache, data_version
 from app.services.visualization import VisualizationService
 
+COMPARISON_OPERATIONS = ["getUserProfile", "skillStats", "userContestRankingInfo"]
+
+comparison_cache = ComparisonCache()
+
 
 def compare_problem_counts_from_data(user1_data, user2_data, username1, username2):
     """Return JSON data for comparing problem counts"""
@@ -28,8 +33,8 @@ def compare_problem_counts_from_data(user1_data, user2_data, username1, username
     )
 
 
-def compare_skills_from_data(user1_data, user2_data, username1, username2):
-    """Return list of JSON data for comparing skills by category"""
+def _sorted_skill_frames(user1_data, user2_data):
+    """Yield (title, df1, df2) with each user's tags sorted by problems solved"""
     data1 = (
         user1_data.get("skillStats", {})
         .get("matchedUser", {})
@@ -41,7 +46,6 @@ def compare_skills_from_data(user1_data, user2_data, username1, username2):
         .get("tagProblemCounts", {})
     )
 
-    charts = []
     problem_types = [
         "Advanced Algorithms",
         "Intermediate Algorithms",
@@ -60,8 +64,15 @@ def compare_skills_from_data(user1_data, user2_data, username1, username2):
             df2.sort_values(by=["problemsSolved"], inplace=True, ascending=False)
             df2.reset_index(drop=True, inplace=True)
 
+        yield problem_types[i], df1, df2
+
+
+def compare_skills_from_data(user1_data, user2_data, username1, username2):
+    """Return list of JSON data for comparing skills by category"""
+    charts = []
+    for problem_type, df1, df2 in _sorted_skill_frames(user1_data, user2_data):
         chart_data = VisualizationService.create_compare_skills_data(
-            df1, df2, username1, username2, problem_types[i]
+            df1, df2, username1, username2, problem_type
         )
         if chart_data:
             charts.append(chart_data)
@@ -116,3 +127,88 @@ def compare_contests_from_data(user1_data, user2_data, username1, username2):
     return VisualizationService.create_compare_contest_data(
         common_contests, username1, username2
     )
+
+
+def _build_joined_comparison(user1_data, user2_data):
+    """Compute the order-independent structures shared by both orderings"""
+    skills = []
+    for problem_type, df1, df2 in _sorted_skill_frames(user1_data, user2_data):
+        skills.append(
+            (
+                problem_type,
+                {
+                    "tagName": list(df1.get("tagName", [])),
+                    "problemsSolved": [int(v) for v in df1.get("problemsSolved", [])],
+                },
+                {
+                    "tagName": list(df2.get("tagName", [])),
+                    "problemsSolved": [int(v) for v in df2.get("problemsSolved", [])],
+                },
+            )
+        )
+
+    return {
+        "problems": compare_problem_counts_from_data(user1_data, user2_data, "", ""),
+        "skills": skills,
+        "contest": compare_contests_from_data(user1_data, user2_data, "", ""),
+    }
+
+
+def _render_pair(chart, swapped, username1, username2, pairs):
+    """Return a per-order copy of a chart, swapping the paired series if needed"""
+    if chart is None:
+        return None
+
+    rendered = dict(chart)
+    if swapped:
+        for first, second in pairs:
+            rendered[first], rendered[second] = chart[second], chart[first]
+    rendered["username1"] = username1
+    rendered["username2"] = username2
+    return rendered
+
+
+def _render_comparison(joined, swapped, username1, username2):
+    """Produce the chart data for one ordering of a cached comparison"""
+    skills = []
+    for problem_type, data_a, data_b in joined["skills"]:
+        data1, data2 = (data_b, data_a) if swapped else (data_a, data_b)
+        chart_data = VisualizationService.create_compare_skills_data(
+            data1, data2, username1, username2, problem_type
+        )
+        if chart_data:
+            skills.append(chart_data)
+
+    return {
+        "problems": _render_pair(
+            joined["problems"], swapped, username1, username2,
+            [("series1", "series2")],
+        ),
+        "skills": skills if skills else None,
+        "contest": _render_pair(
+            joined["contest"], swapped, username1, username2,
+            [("rankings1", "rankings2"), ("ratings1", "ratings2")],
+        ),
+    }
+
+
+def compare_all_from_data(user1_data, user2_data, username1, username2):
+    """Return problems, skills and contest comparison data, cached per user pair.
+
+    The cache key is the unordered pair of usernames plus each user's data
+    version, so /compare/a/b and /compare/b/a share one entry and a change in
+    either user's data misses. Contest histories are chronological, so the
+    common contests come out in the same order whichever user is first.
+    """
+    version1 = data_version(user1_data, COMPARISON_OPERATIONS)
+    version2 = data_version(user2_data, COMPARISON_OPERATIONS)
+    key = ComparisonCache.make_key(username1, version1, username2, version2)
+    swapped = (username1.lower(), version1) != key[0]
+
+    joined = comparison_cache.get(key)
+    if joined is None:
+        first, second = (user2_data, user1_data) if swapped else (user1_data, user2_data)
+        joined = _build_joined_comparison(first, second)
+        comparison_cache.set(key, joined)
+
+    return _render_comparison(joined, swapped, username1, username2)
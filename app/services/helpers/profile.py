@@ -78,8 +78,12 @@ def get_profile_details_from_data(user_data):
     }
 
 
-def get_contest_ranking_from_data(user_data):
-    """Return contest ranking chart data + summary stats"""
+def get_contest_ranking_from_data(user_data, max_points=None):
+    """Return contest ranking chart data + summary stats.
+
+    `max_points` downsamples long histories in the chart only; the summary
+    stats always cover every attended contest.
+    """
     default_response = {
         "total": 0,
         "best": "N/A",
@@ -114,7 +118,9 @@ def get_contest_ranking_from_data(user_data):
     if len(attended_contest) == 0:
         return default_response
 
-    chart_data = VisualizationService.create_contest_chart_data(attended_contest)
+    chart_data = VisualizationService.create_contest_chart_data(
+        attended_contest, max_points=max_points
+    )
 
     return {
         "total": len(attended_contest),
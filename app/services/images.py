@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlencode, urljoin, urlsplit
+
+import httpx
+
+from app.services.leetcode import LeetCodeDataService
+from app.services.offload import run_in_pool
+
+DEFAULT_ALLOWED_HOSTS = ",".join(
+    [
+        "leetcode.com",
+        "assets.leetcode.com",
+        "leetcode.cn",
+        "assets.leetcode.cn",
+        # Only LeetCode's upload bucket, not every bucket on the endpoint
+        "s3-us-west-1.amazonaws.com/s3-lc-upload/",
+    ]
+)
+
+
+class ImageProxyService:
+    """Fetch remote avatars and badge icons once and keep them on disk.
+
+    Image bytes are stored content-addressed under ``blobs/<sha256>``; a small
+    index file per source URL points at the blob, so the same image referenced
+    from several URLs is stored once and its hash doubles as the ETag.
+    """
+
+    STORE_DIR = os.environ.get(
+        "LEETCODE_IMAGE_DIR",
+        os.path.join(tempfile.gettempdir(), "leetcode-visualiser", "images"),
+    )
+    # Entries are "host" or "host/path/prefix/"
+    ALLOWED_HOSTS = [
+        entry.strip()
+        for entry in os.environ.get("LEETCODE_IMAGE_HOSTS", DEFAULT_ALLOWED_HOSTS).split(",")
+        if entry.strip()
+    ]
+    BASE_URL = "https://leetcode.com"
+    MAX_BYTES = 5 * 1024 * 1024
+    MAX_REDIRECTS = 3
+    # Total size of the on-disk store; the oldest files are evicted beyond it
+    STORE_MAX_BYTES = int(os.environ.get("LEETCODE_IMAGE_MAX_BYTES", 200 * 1024 * 1024))
+    # How long a URL keeps pointing at the stored blob before it is refetched
+    INDEX_TTL = 7 * 24 * 3600
+
+    _inflight: Dict[str, "asyncio.Future"] = {}
+
+    @staticmethod
+    def normalize_url(url: str) -> Optional[str]:
+        """Return the absolute URL if it may be proxied, else None"""
+        if not url:
+            return None
+        url = urljoin(ImageProxyService.BASE_URL, url)
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return None
+        # Dot segments could climb out of an allowed path prefix
+        segments = unquote(parts.path).split("/")
+        if "." in segments or ".." in segments:
+            return None
+        host = parts.netloc.lower()
+        for entry in ImageProxyService.ALLOWED_HOSTS:
+            allowed_host, _, prefix = entry.partition("/")
+            if host == allowed_host.lower() and (parts.path or "/").startswith("/" + prefix):
+                return url
+        return None
+
+    @staticmethod
+    def _path(*parts: str) -> str:
+        return os.path.join(ImageProxyService.STORE_DIR, *parts)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Pool threads may write the same blob or variant at once
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read_index(url: str) -> Optional[Dict[str, str]]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        path = ImageProxyService._path("urls", key + ".json")
+        try:
+            if time.time() - os.path.getmtime(path) > ImageProxyService.INDEX_TTL:
+                return None
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(ImageProxyService._path("blobs", entry["sha"])):
+            return None
+        return entry
+
+    @staticmethod
+    def _trim() -> None:
+        """Evict the oldest stored files until the store fits STORE_MAX_BYTES"""
+        # A variant and its .type file are evicted together
+        groups: Dict[str, Tuple[float, int, List[str]]] = {}
+        for sub in ("blobs", "variants", "urls"):
+            directory = ImageProxyService._path(sub)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                group = path[: -len(".type")] if path.endswith(".type") else path
+                mtime, size, paths = groups.get(group, (stat.st_mtime, 0, []))
+                groups[group] = (
+                    min(mtime, stat.st_mtime),
+                    size + stat.st_size,
+                    paths + [path],
+                )
+        total = sum(size for _, size, _ in groups.values())
+        for _, size, paths in sorted(groups.values()):
+            if total <= ImageProxyService.STORE_MAX_BYTES:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    @staticmethod
+    async def _download(url: str) -> Optional[Tuple[bytes, str]]:
+        """Return (content, content type), following only allow-listed redirects"""
+        async with httpx.AsyncClient(
+            follow_redirects=False,
+            timeout=10.0,
+            verify=LeetCodeDataService.SSL_CONTEXT,
+        ) as client:
+            for _ in range(ImageProxyService.MAX_REDIRECTS + 1):
+                async with client.stream("GET", url) as response:
+                    if response.is_redirect:
+                        target = ImageProxyService.normalize_url(
+                            urljoin(url, response.headers.get("location", ""))
+                        )
+                        if target is None:
+                            print(f"Refusing to follow redirect from {url} to a disallowed host")
+                            return None
+                        url = target
+                        continue
+
+                    response.raise_for_status()
+                    content_type = (
+                        response.headers.get("content-type", "").split(";")[0].strip()
+                    )
+                    if not content_type.startswith("image/"):
+                        print(f"Refusing to proxy non-image {url} ({content_type})")
+                        return None
+
+                    chunks, size = [], 0
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > ImageProxyService.MAX_BYTES:
+                            print(f"Refusing to proxy oversized image {url}")
+                            return None
+                        chunks.append(chunk)
+                    return b"".join(chunks), content_type
+
+        print(f"Too many redirects for {url}")
+        return None
+
+    @staticmethod
+    async def _fetch(url: str) -> Optional[Dict[str, str]]:
+        """Download `url` into the blob store and index it"""
+        try:
+            downloaded = await ImageProxyService._download(url)
+        except httpx.HTTPError as e:
+            print(f"Error fetching image {url}: {e}")
+            return None
+        if downloaded is None:
+            return None
+        content, content_type = downloaded
+
+        sha = hashlib.sha256(content).hexdigest()
+        entry = {"sha": sha, "content_type": content_type}
+        await run_in_pool(ImageProxyService._store, url, entry, content)
+        return entry
+
+    @staticmethod
+    def _store(url: str, entry: Dict[str, str], content: bytes) -> None:
+        """Write the blob and URL index, then trim the store (blocking)"""
+        blob = ImageProxyService._path("blobs", entry["sha"])
+        if not os.path.exists(blob):
+            ImageProxyService._write_atomic(blob, content)
+
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        ImageProxyService._write_atomic(
+            ImageProxyService._path("urls", key + ".json"),
+            json.dumps(entry).encode("utf-8"),
+        )
+        ImageProxyService._trim()
+
+    @staticmethod
+    async def _get_entry(url: str) -> Optional[Dict[str, str]]:
+        entry = ImageProxyService._read_index(url)
+        if entry is not None:
+            return entry
+
+        # Concurrent requests for the same URL share one download; shield it
+        # so one client disconnecting does not cancel it for the others
+        inflight = ImageProxyService._inflight.get(url)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(ImageProxyService._fetch(url))
+        ImageProxyService._inflight[url] = task
+        task.add_done_callback(lambda _: ImageProxyService._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _read_variant_type(path: str) -> Optional[str]:
+        """Return the stored variant's content type, or None if either file is missing"""
+        try:
+            with open(path + ".type", encoding="utf-8") as f:
+                content_type = f.read()
+        except OSError:
+            return None
+        return content_type if os.path.exists(path) else None
+
+    @staticmethod
+    def _render_variant(source: str, size: Optional[int], static: bool) -> Tuple[bytes, str]:
+        """Return (bytes, content type) for a resized and/or first-frame image"""
+        from PIL import Image
+
+        with Image.open(source) as image:
+            animated = getattr(image, "is_animated", False)
+            if animated and not static and size is None:
+                with open(source, "rb") as f:
+                    return f.read(), Image.MIME.get(image.format, "image/gif")
+            image.seek(0)
+            frame = image.convert("RGBA")
+            if size:
+                frame.thumbnail((size, size))
+            out = io.BytesIO()
+            frame.save(out, format="PNG", optimize=True)
+            return out.getvalue(), "image/png"
+
+    @staticmethod
+    async def get_image(
+        url: str, size: Optional[int] = None, static: bool = False
+    ) -> Optional[Tuple[str, str, str]]:
+        """Return (path, content type, etag) of the stored image or variant.
+
+        Variants need Pillow; without it the original image is served.
+        """
+        entry = await ImageProxyService._get_entry(url)
+        if entry is None:
+            return None
+
+        source = ImageProxyService._path("blobs", entry["sha"])
+        if not size and not static:
+            return source, entry["content_type"], entry["sha"]
+
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            return source, entry["content_type"], entry["sha"]
+
+        variant = f"{entry['sha']}-{size or 0}{'-static' if static else ''}"
+        path = ImageProxyService._path("variants", variant)
+        content_type = ImageProxyService._read_variant_type(path)
+        if content_type is None:
+            try:
+                data, content_type = await run_in_pool(
+                    ImageProxyService._render_variant, source, size, static
+                )
+            except Exception as e:
+                print(f"Error creating image variant for {url}: {e}")
+                return source, entry["content_type"], entry["sha"]
+            await run_in_pool(
+                ImageProxyService._write_atomic,
+                path + ".type",
+                content_type.encode("utf-8"),
+            )
+            await run_in_pool(ImageProxyService._write_atomic, path, data)
+        return path, content_type, variant
+
+
+def proxy_image_url(url: str, size: Optional[int] = None, static: bool = False) -> str:
+    """Template helper: proxied URL for an image, or the original if not allowed"""
+    absolute = ImageProxyService.normalize_url(url)
+    if absolute is None:
+        return url
+    params = {"url": absolute}
+    if size:
+        params["size"] = size
+    if static:
+        params["static"] = "true"
+    return "/images/proxy?" + urlencode(params)
@@ -1,8 +1,12 @@
 import asyncio
+import os
 from typing import Any, Dict, List, Optional
 
 import httpx
 
+from app.services.cache import CacheBackend, get_cache_backend
+from app.services.usernames import username_index
+
 
 class LeetCodeDataService:
     QUERIES = {
@@ -14,11 +18,27 @@ class LeetCodeDataService:
         "userBadges": "query userBadges($username: String!) { matchedUser(username: $username) { badges { id displayName icon hoverText creationDate medal { slug config { iconGif iconGifBackground } } } } }",
     }
 
+    GRAPHQL_URL = os.environ.get("LEETCODE_GRAPHQL_URL", "https://leetcode.com/graphql")
+    # Building an SSL context takes tens of milliseconds of CPU on the event
+    # loop, so every client shares this one
+    SSL_CONTEXT = httpx.create_ssl_context()
+
+    cache: CacheBackend = get_cache_backend()
+
+    @staticmethod
+    def _cache_key(username: str, operation_name: str) -> str:
+        return f"{operation_name}:{username.lower()}"
+
     @staticmethod
     async def _get_result(
         client: httpx.AsyncClient, username: str, operation_name: str
     ) -> Optional[Dict[str, Any]]:
-        """Make API request to LeetCode GraphQL API"""
+        """Make API request to LeetCode GraphQL API, consulting the cache first"""
+        cache_key = LeetCodeDataService._cache_key(username, operation_name)
+        cached = await LeetCodeDataService.cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
         query = LeetCodeDataService.QUERIES[operation_name]
         payload = {
             "operationName": operation_name,
@@ -31,10 +51,12 @@ class LeetCodeDataService:
         }
         try:
             response = await client.post(
-                url="https://leetcode.com/graphql", json=payload, headers=headers
+                url=LeetCodeDataService.GRAPHQL_URL, json=payload, headers=headers
             )
             response.raise_for_status()
             data = response.json().get("data", {})
+            if data is not None:
+                await LeetCodeDataService.cache.aset(cache_key, data)
             return data
         except httpx.RequestError as e:
             print(f"Error fetching data: {e}")
@@ -44,22 +66,25 @@ class LeetCodeDataService:
             return None
 
     @staticmethod
-    async def fetch_all_user_data(usernames: List[str]) -> Dict[str, Dict[str, Any]]:
+    async def fetch_all_user_data(
+        usernames: List[str], operations: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Fetch all data for multiple users in parallel
+        Fetch all data (or only the given operations) for multiple users in parallel
         """
-        operations = [
-            "userPublicProfile",
-            "getUserProfile",
-            "skillStats",
-            "userProfile",
-            "userContestRankingInfo",
-            "userBadges",
-        ]
+        if operations is None:
+            operations = [
+                "userPublicProfile",
+                "getUserProfile",
+                "skillStats",
+                "userProfile",
+                "userContestRankingInfo",
+                "userBadges",
+            ]
 
         all_results = {}
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(verify=LeetCodeDataService.SSL_CONTEXT) as client:
             tasks = []
             for username in usernames:
                 for op in operations:
@@ -82,14 +107,23 @@ class LeetCodeDataService:
     @staticmethod
     async def validate_user(username: str) -> Dict[str, Any]:
         """Check if user exists and return validation result"""
-        async with httpx.AsyncClient() as client:
+        not_found = {
+            "valid": False,
+            "message": f"User '{username}' does not exist on LeetCode or could not be found.",
+        }
+        if username_index.is_missing(username):
+            return not_found
+
+        async with httpx.AsyncClient(verify=LeetCodeDataService.SSL_CONTEXT) as client:
             data = await LeetCodeDataService._get_result(
                 client, username, "userPublicProfile"
             )
 
         if not data or "matchedUser" not in data or data["matchedUser"] is None:
-            return {
-                "valid": False,
-                "message": f"User '{username}' does not exist on LeetCode or could not be found.",
-            }
+            # Only remember names LeetCode answered for, not failed requests
+            if data is not None and data.get("matchedUser", False) is None:
+                username_index.mark_missing(username)
+            return not_found
+
+        username_index.add(data["matchedUser"].get("username") or username)
         return {"valid": True, "message": "User found", "data": data["matchedUser"]}
@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+RENDER_WORKERS = int(
+    os.environ.get("LEETCODE_RENDER_WORKERS", min(4, os.cpu_count() or 1))
+)
+LOOP_LAG_WARN_MS = float(os.environ.get("LEETCODE_LOOP_LAG_WARN_MS", 100))
+LOOP_LAG_INTERVAL = 0.25
+
+_executor = ThreadPoolExecutor(
+    max_workers=RENDER_WORKERS, thread_name_prefix="render"
+)
+
+
+async def run_in_pool(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a CPU-bound callable (pandas transforms, json.dumps, Jinja rendering)
+    in the bounded render pool so the event loop keeps serving other requests.
+
+    Context variables (e.g. the active request profile) are carried over.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+
+async def monitor_event_loop(
+    threshold_ms: float = LOOP_LAG_WARN_MS, interval: float = LOOP_LAG_INTERVAL
+) -> None:
+    """Warn whenever the event loop wakes up more than `threshold_ms` late"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag_ms = (loop.time() - expected) * 1000
+        if lag_ms > threshold_ms:
+            print(f"Warning: event loop stalled for {lag_ms:.0f} ms")
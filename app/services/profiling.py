@@ -0,0 +1,177 @@
+import hmac
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+PROFILE_HEADER = "X-Profile-Token"
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "active_profile", default=None
+)
+
+
+class RequestProfile:
+    """Phase timings and stack samples for a single profiled request.
+
+    A background thread samples the stack of the thread running the request's
+    current phase (the event loop, or a render pool thread) every `interval`
+    seconds and tags each sample with that phase.
+    Other requests running on the same loop at the time show up in the samples
+    too, so profile on a quiet worker when possible.
+    """
+
+    def __init__(self, name: str, interval: float = 0.005):
+        self.name = name
+        self.interval = interval
+        self.phases: Dict[str, float] = {}
+        self.current_phase = "other"
+        self.samples: Counter = Counter()
+        self.thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            stack.append(self.current_phase)
+            self.samples[";".join(reversed(stack))] += 1
+
+    def add_phase(self, phase: str, elapsed: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+
+    def summary(self) -> Dict:
+        accounted = sum(self.phases.values())
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration * 1000, 3),
+            "phases_ms": {k: round(v * 1000, 3) for k, v in self.phases.items()},
+            "unaccounted_ms": round((self.duration - accounted) * 1000, 3),
+            "samples": sum(self.samples.values()),
+            "sample_interval_ms": self.interval * 1000,
+        }
+
+    def folded(self) -> str:
+        """Return samples in collapsed-stack format for flamegraph.pl/speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+@contextmanager
+def phase(name: str):
+    """Attribute the wrapped block to `name` when the request is being profiled"""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+
+    # Follow the work into render pool threads
+    previous = profile.current_phase, profile.thread_id
+    profile.current_phase = name
+    profile.thread_id = threading.get_ident()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(name, time.perf_counter() - started)
+        profile.current_phase, profile.thread_id = previous
+
+
+class ProfileStore:
+    """Directory of profile reports, trimmed oldest first beyond `max_bytes`"""
+
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, profile: RequestProfile) -> str:
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", profile.name).strip("_") or "root"
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = os.path.join(self.directory, f"{stamp}-{os.getpid()}-{slug}")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(profile.summary(), f, indent=2)
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            f.write(profile.folded())
+        self._trim()
+        return base
+
+    def _trim(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+def install_profiler(app) -> None:
+    """Register the profiling middleware when LEETCODE_PROFILE_TOKEN is set.
+
+    Requests carrying a matching X-Profile-Token header are profiled and the
+    report is written to LEETCODE_PROFILE_DIR. Without the setting no
+    middleware is added, so ordinary requests pay nothing.
+    """
+    token = os.environ.get("LEETCODE_PROFILE_TOKEN")
+    if not token:
+        return
+
+    store = ProfileStore(
+        os.environ.get(
+            "LEETCODE_PROFILE_DIR",
+            os.path.join(tempfile.gettempdir(), "leetcode-visualiser", "profiles"),
+        ),
+        max_bytes=int(os.environ.get("LEETCODE_PROFILE_MAX_BYTES", 50 * 1024 * 1024)),
+    )
+
+    @app.middleware("http")
+    async def profile_request(request, call_next):
+        supplied = request.headers.get(PROFILE_HEADER)
+        # Compare bytes: compare_digest rejects non-ASCII str arguments
+        if supplied is None or not hmac.compare_digest(
+            supplied.encode("utf-8"), token.encode("utf-8")
+        ):
+            return await call_next(request)
+
+        profile = RequestProfile(request.url.path)
+        reset = _active_profile.set(profile)
+        profile.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profile.stop()
+            _active_profile.reset(reset)
+        report = store.save(profile)
+        response.headers["X-Profile-Report"] = os.path.basename(report)
+        return response
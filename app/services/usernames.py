@@ -0,0 +1,121 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List
+
+
+class UsernameIndex:
+    """In-memory prefix index of usernames seen by this process.
+
+    Matches are ranked by how often the user was looked up. Known usernames
+    are kept in a sorted list of lower-cased keys, so the matches for a prefix
+    are one contiguous slice found with bisect. Once a prefix matches more
+    than `scan_limit` names, `add` keeps a top-`top_k` list for it instead;
+    popularity only grows, so these lists stay exact, and every other prefix
+    is ranked from a slice of at most `scan_limit` keys. Usernames LeetCode reported as missing are remembered
+    for `missing_ttl` seconds so they can be rejected without another upstream
+    call.
+    """
+
+    def __init__(
+        self,
+        max_names: int = 100000,
+        scan_limit: int = 128,
+        top_k: int = 20,
+        max_missing: int = 10000,
+        missing_ttl: float = 3600,
+    ):
+        self.max_names = max_names
+        self.scan_limit = scan_limit
+        self.top_k = top_k
+        self.max_missing = max_missing
+        self.missing_ttl = missing_ttl
+        self._keys: List[str] = []
+        self._names: Dict[str, str] = {}
+        self._popularity: Dict[str, int] = {}
+        self._top: Dict[str, List[str]] = {}
+        self._missing: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, username: str) -> None:
+        """Record a successful lookup of an existing user"""
+        key = username.lower()
+        with self._lock:
+            self._missing.pop(key, None)
+            if key not in self._names:
+                if len(self._keys) >= self.max_names:
+                    return
+                insort(self._keys, key)
+            self._names[key] = username
+            self._popularity[key] = self._popularity.get(key, 0) + 1
+            for length in range(1, len(key) + 1):
+                prefix = key[:length]
+                if prefix in self._top:
+                    self._update_top(prefix, key)
+                    continue
+                matches = self._matches(prefix)
+                if len(matches) <= self.scan_limit:
+                    break  # longer prefixes match no more names than this one
+                self._top[prefix] = heapq.nsmallest(self.top_k, matches, key=self._rank)
+
+    def _matches(self, prefix: str) -> List[str]:
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\uffff", start)
+        return self._keys[start:end]
+
+    def _rank(self, key: str):
+        return (-self._popularity[key], len(key), key)
+
+    def _update_top(self, prefix: str, key: str) -> None:
+        top = self._top[prefix]
+        if key not in top:
+            if len(top) >= self.top_k and self._rank(key) >= self._rank(top[-1]):
+                return
+            top.append(key)
+        top.sort(key=self._rank)
+        del top[self.top_k :]
+
+    def mark_missing(self, username: str) -> None:
+        """Record that LeetCode has no user with this name"""
+        key = username.lower()
+        with self._lock:
+            self._missing[key] = time.monotonic() + self.missing_ttl
+            self._missing.move_to_end(key)
+            while len(self._missing) > self.max_missing:
+                self._missing.popitem(last=False)
+
+    def is_missing(self, username: str) -> bool:
+        key = username.lower()
+        with self._lock:
+            expires_at = self._missing.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._missing[key]
+                return False
+            return True
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[str]:
+        """Return up to `limit` known usernames starting with `prefix`, most popular first.
+
+        `limit` is capped at `top_k`.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        limit = min(limit, self.top_k)
+
+        with self._lock:
+            if prefix in self._top:
+                top = self._top[prefix][:limit]
+            else:
+                top = heapq.nsmallest(limit, self._matches(prefix), key=self._rank)
+            return [self._names[k] for k in top]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+username_index = UsernameIndex()
@@ -1,3 +1,8 @@
+import re
+
+_TITLE_NUMBER_RE = re.compile(r"^(.*?)(\d+)$")
+
+
 class VisualizationService:
 
     DIFFICULTY_COLOR_MAP = {
@@ -39,24 +44,128 @@ class VisualizationService:
         }
 
     @staticmethod
-    def create_contest_chart_data(df):
-        """Return JSON data for contest ranking line/bar chart"""
+    def create_contest_chart_data(df, max_points=None):
+        """Return JSON data for contest ranking line/bar chart.
+
+        With `max_points`, histories longer than that are reduced to
+        `max_points` contests with LTTB on the rating line. Rating deltas are
+        still relative to the previous contest actually attended.
+        """
         if len(df) == 0:
             return None
 
+        categories = list(df["contest"])
+        rankings = [int(v) for v in df["ranking"]]
         ratings = [int(round(v)) for v in df.get("rating", [0] * len(df))]
         # Compute rating delta (change from previous contest)
         deltas = [0]  # first contest has no previous
         for i in range(1, len(ratings)):
             deltas.append(ratings[i] - ratings[i - 1])
 
-        return {
-            "categories": list(df["contest"]),
-            "rankings": [int(v) for v in df["ranking"]],
+        chart = {
+            "categories": categories,
+            "rankings": rankings,
             "ratings": ratings,
             "rating_deltas": deltas,
         }
 
+        if max_points and len(ratings) > max_points:
+            indices = VisualizationService.lttb_indices(ratings, max_points)
+            for key in ("categories", "rankings", "ratings", "rating_deltas"):
+                chart[key] = [chart[key][i] for i in indices]
+            chart["downsampled"] = True
+            chart["total_points"] = len(ratings)
+
+        return chart
+
+    @staticmethod
+    def lttb_indices(values, threshold):
+        """Return the indices kept by Largest-Triangle-Three-Buckets downsampling"""
+        n = len(values)
+        if threshold >= n or threshold < 3:
+            return list(range(n))
+
+        indices = [0]
+        bucket_size = (n - 2) / (threshold - 2)
+        a = 0
+        for i in range(threshold - 2):
+            start = int(i * bucket_size) + 1
+            end = int((i + 1) * bucket_size) + 1
+
+            # Average point of the next bucket
+            next_start = end
+            next_end = min(int((i + 2) * bucket_size) + 1, n)
+            if next_start >= next_end:
+                avg_x, avg_y = n - 1, values[n - 1]
+            else:
+                avg_x = (next_start + next_end - 1) / 2
+                avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+            best, best_area = start, -1.0
+            for j in range(start, end):
+                area = abs(
+                    (a - avg_x) * (values[j] - values[a])
+                    - (a - j) * (avg_y - values[a])
+                )
+                if area > best_area:
+                    best, best_area = j, area
+            indices.append(best)
+            a = best
+
+        indices.append(n - 1)
+        return indices
+
+    @staticmethod
+    def compact_chart_data(chart, delta_keys):
+        """Return a columnar encoding of a contest chart for embedding in pages.
+
+        Contest titles are split into an interned prefix table plus a
+        delta-encoded trailing number ("Weekly Contest " + 350), and each
+        series in `delta_keys` is delta-encoded. Full-resolution rating deltas
+        equal the delta-encoded ratings, so they are dropped and rebuilt by
+        dashboard.js, which expands the payload back into the plain chart shape.
+        """
+        if chart is None:
+            return None
+
+        prefixes, prefix_ids, numbers = [], [], []
+        prefix_index = {}
+        previous = 0
+        for title in chart["categories"]:
+            match = _TITLE_NUMBER_RE.match(str(title))
+            if match and str(int(match.group(2))) == match.group(2):
+                prefix, number = match.group(1), int(match.group(2))
+                numbers.append(number - previous)
+                previous = number
+            else:
+                prefix = str(title)
+                numbers.append(None)
+            if prefix not in prefix_index:
+                prefix_index[prefix] = len(prefixes)
+                prefixes.append(prefix)
+            prefix_ids.append(prefix_index[prefix])
+
+        compact = {
+            key: value
+            for key, value in chart.items()
+            if key != "categories" and key not in delta_keys
+        }
+        if "ratings" in delta_keys and not chart.get("downsampled"):
+            compact.pop("rating_deltas", None)
+        compact["compact"] = True
+        compact["delta_keys"] = list(delta_keys)
+        compact["categories"] = {
+            "prefixes": prefixes,
+            "ids": prefix_ids,
+            "numbers": numbers,
+        }
+        for key in delta_keys:
+            values = chart[key]
+            compact[key] = [
+                v if i == 0 else v - values[i - 1] for i, v in enumerate(values)
+            ]
+        return compact
+
     @staticmethod
     def create_language_chart_data(languages):
         """Return JSON data for language pie chart"""
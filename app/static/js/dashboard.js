@@ -11,13 +11,80 @@
     var data = window.__CHART_DATA__;
     if (!data) return;
 
+    if (data.contest && data.contest.compact) {
+      data.contest = expandCompact(data.contest);
+    }
+
     if (window.__COMPARE_MODE__) {
       renderCompareCharts(data);
     } else {
       renderProfileCharts(data);
+      bindFullContestHistory(data);
     }
   });
 
+  // ==================== Payload decoding ====================
+
+  // Expand a compact columnar chart (see VisualizationService.compact_chart_data)
+  function expandCompact(chart) {
+    var result = {};
+    for (var k in chart) {
+      if (chart.hasOwnProperty(k) && k !== 'compact' && k !== 'delta_keys') {
+        result[k] = chart[k];
+      }
+    }
+
+    var cats = chart.categories;
+    var titles = [];
+    var prev = 0;
+    for (var i = 0; i < cats.ids.length; i++) {
+      var prefix = cats.prefixes[cats.ids[i]];
+      var num = cats.numbers[i];
+      if (num === null) {
+        titles.push(prefix);
+      } else {
+        prev += num;
+        titles.push(prefix + prev);
+      }
+    }
+    result.categories = titles;
+
+    chart.delta_keys.forEach(function (key) {
+      var values = [];
+      var acc = 0;
+      chart[key].forEach(function (d) {
+        acc += d;
+        values.push(acc);
+      });
+      result[key] = values;
+    });
+
+    if (result.ratings && !result.rating_deltas) {
+      result.rating_deltas = result.ratings.map(function (r, idx) {
+        return idx === 0 ? 0 : r - result.ratings[idx - 1];
+      });
+    }
+    return result;
+  }
+
+  // "Show all" button on downsampled contest charts loads the full history
+  function bindFullContestHistory(data) {
+    var btn = document.getElementById('contest-full-history');
+    if (!btn) return;
+    btn.addEventListener('click', function () {
+      btn.disabled = true;
+      fetch(btn.getAttribute('data-url'))
+        .then(function (res) { return res.json(); })
+        .then(function (full) {
+          if (!full) return;
+          data.contest = full;
+          btn.style.display = 'none';
+          window.reRenderCharts();
+        })
+        .catch(function () { btn.disabled = false; });
+    });
+  }
+
   // ==================== Helpers ====================
 
   function isDark() {
@@ -215,12 +282,11 @@
     if (data.contest) {
       var contestData = data.contest;
       var len = contestData.categories.length;
-      // Show last 30 contests max for readability
-      var maxShow = 30;
-      var cats = len > maxShow ? contestData.categories.slice(len - maxShow) : contestData.categories;
-      var ranks = len > maxShow ? contestData.rankings.slice(len - maxShow) : contestData.rankings;
-      var ratings = len > maxShow ? contestData.ratings.slice(len - maxShow) : contestData.ratings;
-      var deltas = len > maxShow ? contestData.rating_deltas.slice(len - maxShow) : contestData.rating_deltas;
+      // The server already caps the points (see "Show all" for the rest)
+      var cats = contestData.categories;
+      var ranks = contestData.rankings;
+      var ratings = contestData.ratings;
+      var deltas = contestData.rating_deltas;
 
       renderChart('#chart-contest', {
         chart: { type: 'line', height: 340 },
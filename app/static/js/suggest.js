@@ -0,0 +1,59 @@
+/**
+ * LeetCode Visualiser — Username suggestions
+ * Fills a <datalist> for every username input from /suggest and flags
+ * usernames already known not to exist before the form is submitted.
+ */
+
+(function () {
+  'use strict';
+
+  var DEBOUNCE_MS = 120;
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var inputs = document.querySelectorAll('input[name^="username"]');
+    Array.prototype.forEach.call(inputs, function (input, index) {
+      attach(input, 'username-suggestions-' + index);
+    });
+  });
+
+  function attach(input, listId) {
+    var list = document.createElement('datalist');
+    list.id = listId;
+    input.parentNode.appendChild(list);
+    input.setAttribute('list', listId);
+    input.setAttribute('autocomplete', 'off');
+
+    var timer = null;
+    var latest = '';
+
+    input.addEventListener('input', function () {
+      input.setCustomValidity('');
+      clearTimeout(timer);
+      var query = input.value.trim();
+      if (!query) {
+        list.innerHTML = '';
+        return;
+      }
+      timer = setTimeout(function () {
+        latest = query;
+        fetch('/suggest?q=' + encodeURIComponent(query))
+          .then(function (res) { return res.json(); })
+          .then(function (result) {
+            if (result.query !== latest) return;
+            list.innerHTML = '';
+            result.suggestions.forEach(function (name) {
+              var option = document.createElement('option');
+              option.value = name;
+              list.appendChild(option);
+            });
+            if (result.missing) {
+              input.setCustomValidity("User '" + query + "' does not exist on LeetCode.");
+              input.reportValidity();
+            }
+          })
+          .catch(function () {});
+      }, DEBOUNCE_MS);
+    });
+  }
+
+})();